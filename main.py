@@ -3,6 +3,8 @@ import random
 import json
 import os
 import time
+from collections import deque
+from dataclasses import dataclass
 from enum import Enum
 
 # Initialize pygame
@@ -16,6 +18,8 @@ GRAVITY = 0.5
 JUMP_STRENGTH = -10
 PLAYER_SPEED = 5
 MAP_SPEED = 1  # Speed at which the map moves (pixels per frame)
+LATENCY_SAMPLES = 1000  # Number of recent input latency samples kept for percentiles
+STATS_REFRESH_FRAMES = 30  # Frames between refreshes of the latency overlay
 
 # Colors
 BLACK = (0, 0, 0)
@@ -38,6 +42,131 @@ class ItemType(Enum):
     IRON_SWORD = {"prob": 0.09, "points": 6, "color": (192, 192, 192)}
     GOLD_COIN = {"prob": 0.01, "points": 10, "color": YELLOW}
 
+# Game actions that keys can be bound to
+class Action(Enum):
+    MOVE_LEFT = "move_left"
+    MOVE_RIGHT = "move_right"
+    JUMP = "jump"
+    BACK = "back"
+    NEW_GAME = "new_game"
+    CONTINUE = "continue"
+    EXIT = "exit"
+    TOGGLE_STATS = "toggle_stats"
+
+DEFAULT_BINDINGS = {
+    Action.MOVE_LEFT: [pygame.K_LEFT],
+    Action.MOVE_RIGHT: [pygame.K_RIGHT],
+    Action.JUMP: [pygame.K_SPACE, pygame.K_UP],
+    Action.BACK: [pygame.K_ESCAPE],
+    Action.NEW_GAME: [pygame.K_1],
+    Action.CONTINUE: [pygame.K_2],
+    Action.EXIT: [pygame.K_3],
+    Action.TOGGLE_STATS: [pygame.K_F3],
+}
+
+# Actions that change what the next frame shows in each game state; only these are timed
+STATE_ACTIONS = {
+    "MENU": {Action.NEW_GAME, Action.CONTINUE, Action.EXIT},
+    "PLAYING": {Action.MOVE_LEFT, Action.MOVE_RIGHT, Action.JUMP, Action.BACK},
+}
+
+@dataclass(frozen=True)
+class InputSnapshot:
+    held: frozenset  # Actions whose keys are down this tick
+    pressed: frozenset  # Actions whose keys went down since the previous tick
+    quit: bool = False
+    # pygame events carry no timestamp, so a timed KEYDOWN is only known to have arrived
+    # between the previous drain of the queue (arrival_bound) and this one (dequeue_time)
+    arrival_bound: float = None  # perf_counter() when the queue was last drained before this tick
+    dequeue_time: float = None  # perf_counter() when this tick's first timed KEYDOWN was dequeued
+
+    def is_held(self, action):
+        return action in self.held
+
+    def was_pressed(self, action):
+        return action in self.pressed
+
+class InputManager:
+    def __init__(self, bindings=None):
+        self.bindings = {}
+        self.last_drain_time = None
+        for action, keys in (bindings or DEFAULT_BINDINGS).items():
+            self.bind(action, *keys)
+
+    def bind(self, action, *keys):
+        # Replace the keys bound to an action; a key moved here is unbound from any other action
+        for other, other_keys in self.bindings.items():
+            if other != action:
+                self.bindings[other] = tuple(key for key in other_keys if key not in keys)
+        self.bindings[action] = tuple(keys)
+
+    def actions_for_key(self, key):
+        return [action for action, keys in self.bindings.items() if key in keys]
+
+    def poll(self, timed_actions=None):
+        # Drain the event queue once and build the snapshot used for the whole tick.
+        # Only KEYDOWNs for timed_actions (all bound actions if None) are timestamped.
+        drain_time = time.perf_counter()
+        arrival_bound = self.last_drain_time if self.last_drain_time is not None else drain_time
+        self.last_drain_time = drain_time
+        
+        pressed = set()
+        quit_requested = False
+        dequeue_time = None
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                quit_requested = True
+            elif event.type == pygame.KEYDOWN:
+                actions = self.actions_for_key(event.key)
+                pressed.update(actions)
+                timed = actions if timed_actions is None else [a for a in actions if a in timed_actions]
+                if timed and dequeue_time is None:
+                    dequeue_time = time.perf_counter()
+        
+        keys = pygame.key.get_pressed()
+        held = set()
+        for action, bound_keys in self.bindings.items():
+            if any(keys[key] for key in bound_keys):
+                held.add(action)
+        
+        if dequeue_time is None:
+            arrival_bound = None
+        return InputSnapshot(frozenset(held), frozenset(pressed), quit_requested, arrival_bound, dequeue_time)
+
+class LatencyTracker:
+    # Each sample is a (low, high) pair in seconds: low runs from dequeue to present and
+    # excludes the time the key waited in the queue, high runs from the previous queue
+    # drain to present and includes the worst-case queue wait
+    def __init__(self, max_samples=LATENCY_SAMPLES):
+        self.samples = deque(maxlen=max_samples)
+
+    def record_frame(self, snapshot, now=None):
+        # Call right after the frame built from this snapshot has been presented
+        if snapshot.dequeue_time is None:
+            return
+        if now is None:
+            now = time.perf_counter()
+        self.samples.append((now - snapshot.dequeue_time, now - snapshot.arrival_bound))
+
+    @staticmethod
+    def percentile(ordered, p):
+        # Nearest-rank percentile of an already sorted list
+        if not ordered:
+            return None
+        index = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+    def report(self, points=(50, 95, 99)):
+        # Latency percentiles in milliseconds as (low, high) pairs, None when there are no samples
+        if not self.samples:
+            return {f"p{p}": None for p in points}
+        low = sorted(sample[0] for sample in self.samples)
+        high = sorted(sample[1] for sample in self.samples)
+        return {
+            f"p{p}": (self.percentile(low, p) * 1000, self.percentile(high, p) * 1000)
+            for p in points
+        }
+
 class Player:
     def __init__(self, x, y):
         self.x = x
@@ -52,7 +181,7 @@ class Player:
         self.right_leg_height = 10
         self.animation_speed = 0.2  # Speed of leg animation
         
-    def update(self, platforms):
+    def update(self, platforms, moving=False):
         # Apply gravity
         self.vel_y += GRAVITY
         self.y += self.vel_y
@@ -65,8 +194,7 @@ class Player:
         if abs(self.vel_y) < 0.1:  # Not falling/jumping
             self.step_counter += self.animation_speed
             # Animate legs when moving horizontally
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT] or keys[pygame.K_RIGHT]:
+            if moving:
                 # Alternate leg heights to simulate stepping
                 self.left_leg_height = 10 + int(3 * abs(pygame.math.sin(self.step_counter)))
                 self.right_leg_height = 10 + int(3 * abs(pygame.math.cos(self.step_counter)))
@@ -213,6 +341,11 @@ class Game:
         self.font = pygame.font.SysFont(None, 36)
         self.small_font = pygame.font.SysFont(None, 24)
         self.running = True
+        self.input = InputManager()
+        self.input_latency = LatencyTracker()
+        self.show_stats = False
+        self.stats_text = None
+        self.stats_age = 0
         self.game_state = "MENU"  # MENU, PLAYING
         self.score = 0
         self.player = None
@@ -338,28 +471,30 @@ class Game:
             
             self.items.append(Item(x, y, item_type))
     
-    def handle_events(self):
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
+    def handle_events(self, snapshot):
+        if snapshot.quit:
+            self.running = False
+        
+        if snapshot.was_pressed(Action.TOGGLE_STATS):
+            self.show_stats = not self.show_stats
+            self.stats_text = None
+        
+        if snapshot.was_pressed(Action.BACK):
+            if self.game_state == "PLAYING":
+                self.save_game()
+                self.game_state = "MENU"
+        
+        if self.game_state == "PLAYING":
+            if snapshot.was_pressed(Action.JUMP):
+                self.player.jump()
+        
+        elif self.game_state == "MENU":
+            if snapshot.was_pressed(Action.NEW_GAME):
+                self.start_new_game()
+            elif snapshot.was_pressed(Action.CONTINUE):
+                self.load_game()
+            elif snapshot.was_pressed(Action.EXIT):
                 self.running = False
-            
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    if self.game_state == "PLAYING":
-                        self.save_game()
-                        self.game_state = "MENU"
-                
-                if self.game_state == "PLAYING":
-                    if event.key == pygame.K_SPACE or event.key == pygame.K_UP:
-                        self.player.jump()
-                
-                elif self.game_state == "MENU":
-                    if event.key == pygame.K_1:
-                        self.start_new_game()
-                    elif event.key == pygame.K_2:
-                        self.load_game()
-                    elif event.key == pygame.K_3:
-                        self.running = False
     
     def start_new_game(self):
         self.game_state = "PLAYING"
@@ -417,16 +552,17 @@ class Game:
         with open(self.save_file, 'w') as f:
             json.dump(save_data, f)
     
-    def update(self):
+    def update(self, snapshot):
         if self.game_state == "PLAYING":
             # Handle player movement
-            keys = pygame.key.get_pressed()
+            moving_left = snapshot.is_held(Action.MOVE_LEFT)
+            moving_right = snapshot.is_held(Action.MOVE_RIGHT)
             
             # Calculate potential new player position
             new_player_x = self.player.x
-            if keys[pygame.K_LEFT]:
+            if moving_left:
                 new_player_x -= PLAYER_SPEED
-            if keys[pygame.K_RIGHT]:
+            if moving_right:
                 new_player_x += PLAYER_SPEED
             
             # Check if player is trying to go left of the world start
@@ -435,13 +571,13 @@ class Game:
                 self.player.x = self.world_start_x
             else:
                 # Apply movement
-                if keys[pygame.K_LEFT]:
+                if moving_left:
                     self.player.move_left()
-                if keys[pygame.K_RIGHT]:
+                if moving_right:
                     self.player.move_right()
             
             # Update player (apply gravity and collision)
-            self.player.update(self.platforms)
+            self.player.update(self.platforms, moving_left or moving_right)
             
             # Implement screen following with proper logic
             # Screen follows player only when moving right from center
@@ -598,21 +734,47 @@ class Game:
         score_text = self.font.render(f"SCORE: {self.score}", True, WHITE)
         self.screen.blit(score_text, (10, 10))
     
+    def format_latency(self, stats):
+        return "  ".join(
+            f"{name} {value[0]:.1f}-{value[1]:.1f}ms" if value is not None else f"{name} -"
+            for name, value in stats.items()
+        )
+    
+    def draw_stats(self):
+        # Draw input latency percentiles (toggle with F3), re-rendered every few frames
+        if self.stats_text is None or self.stats_age >= STATS_REFRESH_FRAMES:
+            stats = self.input_latency.report()
+            self.stats_text = self.small_font.render("INPUT " + self.format_latency(stats), True, WHITE)
+            self.stats_age = 0
+        self.stats_age += 1
+        self.screen.blit(self.stats_text, (SCREEN_WIDTH - self.stats_text.get_width() - 10, 10))
+    
     def run(self):
         while self.running:
-            self.handle_events()
+            # One input snapshot per tick, shared by event handling and update
+            snapshot = self.input.poll(STATE_ACTIONS[self.game_state])
+            self.handle_events(snapshot)
             
             if self.game_state == "PLAYING":
-                self.update()
+                self.update(snapshot)
             
             if self.game_state == "MENU":
                 self.draw_menu()
             elif self.game_state == "PLAYING":
                 self.draw_game()
             
+            if self.show_stats:
+                self.draw_stats()
+            
             pygame.display.flip()
+            self.input_latency.record_frame(snapshot)
             self.clock.tick(FPS)
         
+        stats = self.input_latency.report()
+        if stats["p50"] is not None:
+            # Each range is dequeue-to-present (queue wait excluded) up to previous-drain-to-present
+            print("Input latency: " + self.format_latency(stats))
+        
         pygame.quit()
 
 if __name__ == "__main__":
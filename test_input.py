@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the input layer: snapshots, key bindings and latency percentiles
+"""
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from main import Action, InputManager, InputSnapshot, LatencyTracker, STATE_ACTIONS
+
+
+def make_snapshot(arrival_bound, dequeue_time):
+    return InputSnapshot(frozenset(), frozenset(), False, arrival_bound, dequeue_time)
+
+
+def test_empty_tracker_reports_none():
+    tracker = LatencyTracker()
+    assert LatencyTracker.percentile([], 50) is None
+    assert tracker.report() == {"p50": None, "p95": None, "p99": None}
+
+
+def test_percentiles_on_known_samples():
+    ordered = [i / 1000 for i in range(1, 101)]  # 1ms..100ms
+    assert LatencyTracker.percentile(ordered, 50) == 0.051
+    assert LatencyTracker.percentile(ordered, 95) == 0.095
+    assert LatencyTracker.percentile(ordered, 99) == 0.099
+
+
+def test_report_gives_low_and_high_bounds():
+    tracker = LatencyTracker()
+    # Key dequeued 5ms before present, previous drain 20ms before present
+    tracker.record_frame(make_snapshot(arrival_bound=1.0, dequeue_time=1.015), now=1.020)
+    low, high = tracker.report()["p50"]
+    assert round(low, 3) == 5.0
+    assert round(high, 3) == 20.0
+
+
+def test_frames_without_timed_input_are_not_recorded():
+    tracker = LatencyTracker()
+    tracker.record_frame(make_snapshot(None, None), now=1.0)
+    assert len(tracker.samples) == 0
+
+
+def test_tracker_evicts_oldest_samples():
+    tracker = LatencyTracker(max_samples=3)
+    for i in range(5):
+        tracker.record_frame(make_snapshot(0.0, 0.0), now=float(i))
+    assert [high for _, high in tracker.samples] == [2.0, 3.0, 4.0]
+
+
+def test_bind_replaces_keys_for_action():
+    manager = InputManager()
+    manager.bind(Action.JUMP, pygame.K_w)
+    assert manager.bindings[Action.JUMP] == (pygame.K_w,)
+    assert manager.actions_for_key(pygame.K_SPACE) == []
+    assert manager.actions_for_key(pygame.K_w) == [Action.JUMP]
+
+
+def test_bind_unbinds_key_from_other_actions():
+    manager = InputManager()
+    manager.bind(Action.JUMP, pygame.K_1)
+    assert manager.actions_for_key(pygame.K_1) == [Action.JUMP]
+    assert manager.bindings[Action.NEW_GAME] == ()
+
+
+def test_snapshot_is_immutable():
+    snapshot = make_snapshot(None, None)
+    try:
+        snapshot.quit = True
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError("InputSnapshot should be frozen")
+
+
+def test_poll_only_times_actions_used_in_state():
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    manager = InputManager()
+    manager.poll()
+    
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_F3))
+    snapshot = manager.poll(STATE_ACTIONS["PLAYING"])
+    assert snapshot.was_pressed(Action.TOGGLE_STATS)
+    assert snapshot.dequeue_time is None
+    assert snapshot.arrival_bound is None
+    
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+    snapshot = manager.poll(STATE_ACTIONS["PLAYING"])
+    assert snapshot.was_pressed(Action.JUMP)
+    assert snapshot.arrival_bound <= snapshot.dequeue_time